@@ -1,18 +1,173 @@
+# Automated PR review: sends the added lines of changed files to the DEX API and posts
+# the feedback as a GitHub review.
+#
+# Run time is spent waiting on GitHub and DEX, not in Python. Speed-ups belong in the I/O
+# path (pooled sessions, batching DEX calls, concurrency, response and ETag caching), not in
+# JIT compilers such as Numba or C extensions, whose import and compile cost would only add
+# to CI cold start.
+
 import os
+import re
 import sys
 import json
+import logging
+import gzip
+import hashlib
+import textwrap
+import time
+from contextlib import closing
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from urllib.parse import urlencode
+
 import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
 
 # GitHub environment variables
 GITHUB_TOKEN = os.getenv('GITHUB_TOKEN')
 GITHUB_REPOSITORY = os.getenv('GITHUB_REPOSITORY')
 PR_NUMBER = os.getenv('PR_NUMBER')
+PR_HEAD_SHA = os.getenv('PR_HEAD_SHA')
 GITHUB_API_URL = 'https://api.github.com'
 custom_service_cookie = os.getenv('CUSTOM_SERVICE_COOKIE')
 
+# Log full DEX payloads and responses when set
+DEBUG = bool(os.getenv('CODE_REVIEW_DEBUG'))
+
+logging.basicConfig(level=logging.DEBUG if DEBUG else logging.INFO, format='%(levelname)s: %(message)s')
+logger = logging.getLogger(__name__)
+
+# Raw response bytes included in debug and error logs
+MAX_DEBUG_RESPONSE_BYTES = 4096
+
 # Philips OpenAI API URL
 AZURE_OPENAI_API_URL = 'https://www.dex.inside.philips.com/philips-ai-chat/chat/api/user/SendImageMessage'
 
+# Page size for listing PR files; GitHub caps this at 100
+FILES_PER_PAGE = 100
+
+# File extensions worth sending for review
+RELEVANT_EXTENSIONS = frozenset({
+    '.py', '.js', '.jsx', '.ts', '.tsx', '.java', '.cs', '.c', '.cpp', '.h', '.hpp',
+    '.go', '.rb', '.php', '.html', '.css', '.kt', '.swift', '.scala', '.rs', '.sh',
+    '.dart', '.sql'
+})
+
+# Gzip-encode DEX request bodies; only enable if the endpoint accepts Content-Encoding: gzip
+GZIP_REQUESTS = bool(os.getenv('CODE_REVIEW_GZIP'))
+
+# Upper bound on concurrent review batches in flight against the DEX API; lower it if DEX rate-limits
+try:
+    MAX_WORKERS = max(1, int(os.getenv('CODE_REVIEW_MAX_WORKERS', '8')))
+except ValueError:
+    logger.error("CODE_REVIEW_MAX_WORKERS must be an integer, got %r", os.getenv('CODE_REVIEW_MAX_WORKERS'))
+    sys.exit(1)
+
+# (connect, read) timeouts in seconds, applied per attempt. A DEX read timeout is not retried, so a
+# stalled DEX call gives up after 130 s; a call that keeps getting 429/5xx makes at most 6 attempts,
+# about 13 minutes plus the backoff or Retry-After waits. A GitHub GET retries timeouts too, for at
+# most 6 x 40 s. DEX reads are long because the model answers a whole batch at once
+GITHUB_TIMEOUT = (10, 30)
+DEX_TIMEOUT = (10, 120)
+
+# Combined diff size per DEX call; larger PRs are split into several batches
+MAX_BATCH_CHARS = 60000
+
+# Directory holding cached DEX feedback, keyed by a hash of the prompts and diff,
+# and ETag-tagged GitHub responses under github/
+CACHE_DIR = Path(os.getenv('CODE_REVIEW_CACHE_DIR', '.cache/code_review'))
+
+# Seconds cached DEX feedback stays valid
+FEEDBACK_CACHE_TTL = 24 * 60 * 60
+
+# Unified diff hunk header
+HUNK_HEADER_RE = re.compile(r'^@@ -\d+(?:,\d+)? \+\d+(?:,\d+)? @@')
+
+# Added diff line, excluding the '+++' file header
+ADDED_LINE_RE = re.compile(r'^\+(?!\+\+)[^\r\n]*', re.MULTILINE)
+
+# Diffs with fewer changed lines or added characters than this are not worth an LLM call
+TRIVIAL_MIN_LINES = 3
+TRIVIAL_MIN_CHARS = 40
+
+TRIVIAL_FEEDBACK = 'Everything looks good.'
+
+# Line comment markers per reviewed extension. '#' is code in C/C++/C# (#include, #if) and
+# CSS (#id selectors), so it only marks a comment in the languages where it is one
+LINE_COMMENT_MARKERS = {
+    **dict.fromkeys(('.py', '.rb', '.sh'), ('#',)),
+    **dict.fromkeys((
+        '.js', '.jsx', '.ts', '.tsx', '.java', '.cs', '.c', '.cpp', '.h', '.hpp',
+        '.go', '.php', '.kt', '.swift', '.scala', '.rs', '.dart'
+    ), ('//',)),
+    '.sql': ('--',),
+}
+
+# Block comment delimiters per reviewed extension
+BLOCK_COMMENT_DELIMITERS = {
+    **dict.fromkeys((
+        '.js', '.jsx', '.ts', '.tsx', '.java', '.cs', '.c', '.cpp', '.h', '.hpp',
+        '.go', '.php', '.kt', '.swift', '.scala', '.rs', '.dart', '.css', '.sql'
+    ), ('/*', '*/')),
+    '.html': ('<!--', '-->'),
+}
+
+# Per-file section header used to delimit diffs in the prompt
+FILE_SECTION_RE = re.compile(r'^### FILE: (.+)$', re.MULTILINE)
+
+# Markdown code fence the model may wrap its JSON reply in
+CODE_FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$')
+
+# Review criteria; the expected output format is spelled out in SYSTEM_PROMPT
+RULES = textwrap.dedent("""
+    1. Code Quality: Ensure clear naming conventions, avoid magic numbers, and verify that functions have appropriate comments.
+    2. Performance Optimization: Identify any unnecessary iterations or inefficient string concatenations.
+    3. Security Best Practices: Check for proper input validation and the absence of hard-coded secrets.
+    4. Maintainability: Look for dead code, proper exception handling, and ensure modularity.
+    5. Code Style: Confirm consistent indentation, brace style, and identify any duplicated code.
+""").strip()
+
+# Instructions sent as the system message of every DEX call
+SYSTEM_PROMPT = (
+    "Please review the code changes in the diffs provided by the user based on the following criteria:\n\n"
+    + RULES +
+    "\n\nReview each file separately. If the overall code of a file appears to be 80% good or more and has no critical issues, its feedback is: 'Everything looks good.'"
+    " If there are critical issues that need attention, provide a brief summary (max 2 sentences) of the key areas needing improvement."
+    " Include a code snippet from the diff that illustrates the issue, without suggesting detailed solutions or minor improvements."
+    "\n\nKeep the feedback brief, as if it were from a human reviewer."
+    "\n\nRespond only with a JSON object mapping each file name to its feedback string."
+)
+
+# Lead-in of the user message; the batched diffs follow it
+USER_PROMPT_HEADER = "Here are the diffs with only the added lines, each preceded by a '### FILE: <name>' header:\n\n"
+
+def json_dumps(obj, pretty=False):
+    """Serialize obj to UTF-8 JSON bytes, compact unless pretty, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def json_loads(data):
+    """Parse JSON from bytes or str, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# The system message never changes, so it is JSON-encoded once and spliced into each request body
+_SYSTEM_MESSAGE_JSON = json_dumps({
+    "role": "system",
+    "content": [{"type": "text", "text": SYSTEM_PROMPT}]
+})
+
 # Headers for GitHub API requests
 headers = {
     'Authorization': f'token {GITHUB_TOKEN}',
@@ -21,7 +176,7 @@ headers = {
 
 # Check if cookie is set, or exit
 if not custom_service_cookie:
-    print("Error: CUSTOM_SERVICE_COOKIE environment variable is not set")
+    logger.error("CUSTOM_SERVICE_COOKIE environment variable is not set")
     sys.exit(1)
 
 # Custom headers for Philips API
@@ -30,236 +185,415 @@ philips_headers = {
     'Content-Type': 'application/json'
 }
 
-def get_changed_files():
-    """Fetch the list of changed files in the PR."""
-    url = f'{GITHUB_API_URL}/repos/{GITHUB_REPOSITORY}/pulls/{PR_NUMBER}/files'
-    response = requests.get(url, headers=headers)
+def create_session(session_headers, retries, pool_maxsize=20):
+    """Create a session with pooled keep-alive connections and retries on transient errors."""
+    session = requests.Session()
+    session.headers.update(session_headers)
+    session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=pool_maxsize, max_retries=retries))
+    return session
+
+# Retry(allowed_methods=...) needs urllib3 1.26; its backoff_max and backoff_jitter arrived in 2.0
+URLLIB3_VERSION = tuple(int(part) for part in urllib3.__version__.split('.')[:2])
+if URLLIB3_VERSION < (1, 26):
+    logger.error("urllib3 %s is too old; install urllib3>=1.26", urllib3.__version__)
+    sys.exit(1)
+# urllib3 1.26 backs off without jitter, capped at its own 120 s
+DEX_BACKOFF = {'backoff_max': 30, 'backoff_jitter': 0.5} if URLLIB3_VERSION >= (2, 0) else {}
+
+# One session per host so TCP/TLS connections are reused across calls
+# Review POSTs are not retried on GitHub: a 5xx after the write landed would post the review twice
+gh_session = create_session(headers, Retry(
+    total=5,
+    backoff_factor=0.5,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=['GET'],
+    respect_retry_after_header=True
+))
+
+# DEX rate-limits bursts; back off exponentially with jitter, so concurrent batches and
+# other PRs do not retry in lockstep, and honour Retry-After, including for POSTs.
+# Read timeouts are not retried: the model may still be answering, and a resend re-bills the prompt
+# Every worker may hold a DEX connection at once, so the pool is at least MAX_WORKERS wide
+dex_session = create_session(philips_headers, Retry(
+    total=5,
+    read=False,
+    backoff_factor=1.5,
+    **DEX_BACKOFF,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=['POST'],
+    respect_retry_after_header=True
+), pool_maxsize=max(20, MAX_WORKERS))
+
+def get_github_page(url, params=None):
+    """GET a GitHub API resource, revalidating a locally cached copy with its ETag.
+
+    Returns the decoded body and the URL of the next page, or None on the last page.
+    """
+    cache_key = hashlib.sha256(f"{url}?{urlencode(params or {})}".encode('utf-8')).hexdigest()
+    cache_path = CACHE_DIR / 'github' / cache_key
+    try:
+        cached = json_loads(cache_path.read_bytes())
+    except (OSError, ValueError):
+        cached = None
+
+    # A 304 reply has no body and does not count against the primary rate limit
+    request_headers = {'If-None-Match': cached['etag']} if cached else {}
+    response = gh_session.get(url, params=params, headers=request_headers, timeout=GITHUB_TIMEOUT)
+    if cached and response.status_code == 304:
+        return cached['body'], cached.get('next')
     response.raise_for_status()
-    files = response.json()
-    return files
+
+    body = json_loads(response.content)
+    next_url = response.links.get('next', {}).get('url')
+    etag = response.headers.get('ETag')
+    if etag:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_path.write_bytes(json_dumps({'etag': etag, 'body': body, 'next': next_url}))
+        except OSError as e:
+            logger.warning("Failed to cache GitHub response: %s", e)
+    return body, next_url
+
+def get_github_json(url, params=None):
+    """GET a single GitHub API resource through the ETag cache."""
+    body, _ = get_github_page(url, params)
+    return body
+
+def iter_changed_files():
+    """Yield the changed files of the PR one page at a time, following the Link header."""
+    url = f'{GITHUB_API_URL}/repos/{GITHUB_REPOSITORY}/pulls/{PR_NUMBER}/files'
+    params = {'per_page': FILES_PER_PAGE}
+    while url:
+        files, url = get_github_page(url, params)
+        # The next link already carries the query string
+        params = None
+        yield from files
 
 def filter_relevant_files(files):
-    """Filter files based on extensions."""
-    relevant_extensions = (
-        '.py', '.js', '.jsx', '.ts', '.tsx', '.java', '.cs', '.c', '.cpp', '.h', '.hpp',  
-        '.go', '.rb', '.php', '.html', '.css', '.kt', '.swift', '.scala', '.rs', '.sh', 
-        '.dart', '.sql'
-    )
-    return [f for f in files if f['filename'].endswith(relevant_extensions)]
+    """Filter files based on extensions, skipping removed files and files without a textual patch."""
+    return [
+        f for f in files
+        if os.path.splitext(f['filename'])[1].lower() in RELEVANT_EXTENSIONS
+        and f.get('patch')
+        and f.get('status') != 'removed'
+        and f.get('changes', 0) > 0
+    ]
 
 def fetch_added_lines_only(file):
     """Fetch only the added lines (lines starting with '+') from the diff."""
-    patch = file.get('patch', '')
-    added_lines = [line for line in patch.splitlines() if line.startswith('+') and not line.startswith('+++')]
-    return '\n'.join(added_lines)
+    return '\n'.join(ADDED_LINE_RE.findall(file.get('patch') or ''))
+
+def _scan_comment_line(text, markers, block, in_block):
+    """Scan a stripped source line for code outside comments.
+
+    Returns whether the line holds only comments and whether a block comment is still open after it.
+    Code after a closing delimiter, e.g. '/* fix */ call();', makes the line code.
+    """
+    start, end = block or (None, None)
+    while True:
+        if in_block:
+            close = text.find(end)
+            if close == -1:
+                return True, True
+            text = text[close + len(end):].strip()
+            in_block = False
+        if not text or (markers and text.startswith(markers)):
+            return True, False
+        if start and text.startswith(start):
+            text = text[len(start):]
+            in_block = True
+            continue
+        return False, False
+
+def is_comment_only(patch, filename):
+    """Check whether every changed line of a patch is blank or a comment in the file's language.
+
+    Block comments are followed through the patch, so a continuation line such as ' * text' only
+    counts as a comment inside a block opened in the patch; elsewhere it may be code.
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    markers = LINE_COMMENT_MARKERS.get(extension, ())
+    block = BLOCK_COMMENT_DELIMITERS.get(extension)
+    if not markers and not block:
+        return False
+
+    in_block = False
+    for line in patch.splitlines():
+        if line.startswith(('+++', '---', '\\')):
+            continue
+        if HUNK_HEADER_RE.match(line):
+            # The block state before a hunk is unknown
+            in_block = False
+            continue
+        is_comment, in_block = _scan_comment_line(line[1:].strip(), markers, block, in_block)
+        if line.startswith(('+', '-')) and not is_comment:
+            return False
+    return True
+
+def is_trivial(patch, filename):
+    """Check whether a patch is too small, or only touches blanks, comments or punctuation, to need a review."""
+    changed_lines = [
+        line for line in patch.splitlines()
+        if line.startswith(('+', '-')) and not line.startswith(('+++', '---')) and line[1:].strip()
+    ]
+    if len(changed_lines) < TRIVIAL_MIN_LINES:
+        return True
+    if is_comment_only(patch, filename):
+        return True
+    added_lines = [line[1:].strip() for line in changed_lines if line.startswith('+')]
+    if sum(len(line) for line in added_lines) < TRIVIAL_MIN_CHARS:
+        return True
+    # Only punctuation was added, e.g. closing braces or reformatted brackets
+    return not any(char.isalnum() for line in added_lines for char in line)
+
+def first_added_position(patch):
+    """Return the GitHub diff position of the first added line, or None if nothing was added."""
+    # GitHub counts positions from the first hunk header, which is position 0
+    for position, line in enumerate(patch.splitlines()):
+        if line.startswith('+'):
+            return position
+    return None
+
+def _cache_key(diff):
+    """Build the cache key for a diff reviewed under the current system prompt and user message lead-in."""
+    return hashlib.sha256("\x00".join((SYSTEM_PROMPT, USER_PROMPT_HEADER, diff)).encode('utf-8')).hexdigest()
+
+def load_cached_feedback(diff):
+    """Return feedback cached for an identical diff and prompt, or None."""
+    path = CACHE_DIR / _cache_key(diff)
+    try:
+        if time.time() - path.stat().st_mtime > FEEDBACK_CACHE_TTL:
+            return None
+        return json_loads(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+
+def store_cached_feedback(diff, feedback):
+    """Persist feedback so re-runs with the same diff skip the DEX API call."""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        (CACHE_DIR / _cache_key(diff)).write_bytes(json_dumps(feedback))
+    except OSError as e:
+        logger.warning("Failed to cache feedback: %s", e)
 
 def get_pull_request_commit_id():
     """Fetch the head commit ID of the pull request."""
     url = f'{GITHUB_API_URL}/repos/{GITHUB_REPOSITORY}/pulls/{PR_NUMBER}'
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-    pr_data = response.json()
+    pr_data = get_github_json(url)
     return pr_data['head']['sha']
 
-def send_diff_to_openai(diff, rules):
-    """Send the diff to the Azure OpenAI API for code review with cookie-based authentication."""
-    payload = {
-        "messages": [
+def batch_diffs(diffs):
+    """Split {filename: diff} into batches whose combined diff size stays within MAX_BATCH_CHARS."""
+    batches = []
+    current, current_size = {}, 0
+    for filename, diff in diffs.items():
+        if current and current_size + len(diff) > MAX_BATCH_CHARS:
+            batches.append(current)
+            current, current_size = {}, 0
+        current[filename] = diff
+        current_size += len(diff)
+    if current:
+        batches.append(current)
+    return batches
+
+def parse_batch_feedback(content, diffs):
+    """Parse the model's {filename: feedback} reply, keeping only files that were sent."""
+    text = CODE_FENCE_RE.sub('', content.strip())
+    try:
+        result = json_loads(text)
+    except ValueError:
+        result = None
+
+    if not isinstance(result, dict):
+        # A single-file batch can still be used if the model answered in plain text
+        if len(diffs) == 1:
+            return {next(iter(diffs)): content}
+        # Models often echo the '### FILE:' headers instead of producing JSON
+        sections = FILE_SECTION_RE.split(content)
+        result = {name.strip(): body.strip() for name, body in zip(sections[1::2], sections[2::2])}
+    if not result:
+        logger.warning("DEX API response contains no per-file feedback.")
+        return {}
+    # With one file sent, a lone entry is its feedback even if keyed './path', by basename or 'feedback'
+    if len(diffs) == 1 and len(result) == 1:
+        feedback = next(iter(result.values()))
+        return {next(iter(diffs)): feedback} if isinstance(feedback, str) and feedback else {}
+    return {
+        filename: feedback for filename, feedback in result.items()
+        if filename in diffs and isinstance(feedback, str) and feedback
+    }
+
+def send_diff_to_openai(diffs):
+    """Send a batch of file diffs to the Azure OpenAI API for code review with cookie-based authentication."""
+    combined_diff = "\n\n".join(f"### FILE: {filename}\n{diff}" for filename, diff in diffs.items())
+    user_message = {
+        "role": "user",
+        "content": [
             {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "text",
-                        "text": (
-                            "Please review the code changes provided in the diff below based on the following criteria:\n\n"
-                            + rules +
-                            "\n\nIf the overall code appears to be 80% good or more and has no critical issues, respond with: 'Everything looks good.'"
-                            " If there are critical issues that need attention, provide a brief summary (max 2 sentences) of the key areas needing improvement."
-                            " Include a code snippet from the diff that illustrates the issue, without suggesting detailed solutions or minor improvements."
-                            "\n\nKeep the response brief, as if it were from a human reviewer."
-                            "\n\nHere is the diff with only the added lines:\n\n"
-                            + diff
-                        )
-                    }
-                ]
+                "type": "text",
+                "text": f"{USER_PROMPT_HEADER}{combined_diff}"
             }
         ]
     }
 
-    print("Payload being sent to DEX API:")
-    print(json.dumps(payload, indent=2))
+    # Pretty-printing the diff is only worth doing when a handler will emit it
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("User message being sent to DEX API:\n%s", json_dumps(user_message, pretty=True).decode('utf-8'))
+
+    body = b'{"messages":[' + _SYSTEM_MESSAGE_JSON + b',' + json_dumps(user_message) + b']}'
+    request_headers = {}
+    if GZIP_REQUESTS:
+        # Diffs compress well, which shortens uploads on slow CI runners
+        body = gzip.compress(body)
+        request_headers['Content-Encoding'] = 'gzip'
 
     try:
-        response = requests.post(AZURE_OPENAI_API_URL, json=payload, headers=philips_headers)
+        response = dex_session.post(AZURE_OPENAI_API_URL, data=body, headers=request_headers, timeout=DEX_TIMEOUT)
         response.raise_for_status()
 
-        print(f"API response status code: {response.status_code}")
-        print(f"Raw response content: {response.text}")
+        logger.info("API response status code: %s", response.status_code)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Raw response content: %r", response.content[:MAX_DEBUG_RESPONSE_BYTES])
 
         # Parse the response content as JSON
-        response_data = response.json()
+        response_data = json_loads(response.content)
 
         # Extract the content from the API's response
         if "choices" in response_data and len(response_data["choices"]) > 0:
-            return response_data["choices"][0]["message"]["content"]
+            return parse_batch_feedback(response_data["choices"][0]["message"]["content"], diffs)
         else:
-            print("Unexpected response format from DEX API.")
+            logger.warning("Unexpected response format from DEX API.")
             return None
 
     except requests.exceptions.RequestException as e:
-        print(f"Failed to get a response from DEX API: {e}")
+        logger.error("Failed to get a response from DEX API: %s", e)
+        return None
+    except ValueError as e:
+        logger.error("Failed to parse DEX API response: %s", e)
         return None
 
-def post_review(content, commit_id, file):
-    """Post a review comment on the PR."""
-    review_comments = [{
+def build_review_comment(content, file):
+    """Build the review comment carrying the feedback for a file."""
+    # Anchor the comment on the first added line; fall back to the start of the diff
+    position = first_added_position(file.get('patch') or '')
+    return {
         'path': file['filename'],
-        'position': 1,  # General comment at the start of the diff
+        'position': 1 if position is None else position,
         'body': content
-    }]
+    }
 
+def post_review(comments, commit_id):
+    """Post a single review on the PR containing the comments for all files."""
     url = f'{GITHUB_API_URL}/repos/{GITHUB_REPOSITORY}/pulls/{PR_NUMBER}/reviews'
     review_data = {
         'commit_id': commit_id,
         'body': 'Automated Code Review by OpenAI Azure 4o',
         'event': 'COMMENT',
-        'comments': review_comments
+        'comments': comments
     }
 
     try:
-        response = requests.post(url, headers=headers, json=review_data)
+        response = gh_session.post(
+            url, data=json_dumps(review_data), headers={'Content-Type': 'application/json'}, timeout=GITHUB_TIMEOUT
+        )
         response.raise_for_status()
-        print("Review posted successfully.")
+        logger.info("Review with %d comment(s) posted successfully.", len(comments))
     except requests.exceptions.RequestException as e:
-        print(f"Failed to post review: {e}")
-        print(f"Response content: {response.content}")
+        logger.error("Failed to post review: %s", e)
+        # Connection errors carry no response; GitHub's error body is short, so log just its start
+        if e.response is not None:
+            logger.error("Response content: %r", e.response.content[:MAX_DEBUG_RESPONSE_BYTES])
 
-def main():
-    files = get_changed_files()
-    relevant_files = filter_relevant_files(files)
-    if not relevant_files:
-        print("No relevant files to analyze.")
-        sys.exit(0)
+def review_batch(diffs):
+    """Review a batch of files with a single DEX API call and cache the feedback for each file.
 
-    # Fetch the correct commit ID from the PR
-    commit_id = get_pull_request_commit_id()
+    Returns the feedback by file and the files of a multi-file batch that the model answered for
+    but skipped or garbled, which are worth retrying on their own.
+    """
+    logger.info("Sending added lines from %d file(s) to DEX API for review...", len(diffs))
+    feedback_by_file = send_diff_to_openai(diffs)
+    if feedback_by_file is None:
+        return {}, []
 
-    # Define the rules with more detailed instructions and examples
-    rules = """
-    Please review the code changes provided in the diff below based on the following criteria:
-    1. Code Quality: Ensure clear naming conventions, avoid magic numbers, and verify that functions have appropriate comments.
-    2. Performance Optimization: Identify any unnecessary iterations or inefficient string concatenations.
-    3. Security Best Practices: Check for proper input validation and the absence of hard-coded secrets.
-    4. Maintainability: Look for dead code, proper exception handling, and ensure modularity.
-    5. Code Style: Confirm consistent indentation, brace style, and identify any duplicated code.
+    for filename, feedback in feedback_by_file.items():
+        store_cached_feedback(diffs[filename], feedback)
+    missing = [filename for filename in diffs if filename not in feedback_by_file] if len(diffs) > 1 else []
+    return feedback_by_file, missing
 
-    If the overall code appears to be 80% good or more and has no critical issues, simply respond with 'Everything looks good.' If there are critical issues, provide a brief summary (max 2 sentences) of the key areas needing improvement, and include a code snippet from the diff that illustrates the issue. Keep the tone brief and human-like.
-    """
+def main():
+    # The workflow already knows the PR head commit; only ask GitHub when it is not passed in,
+    # and do so while the changed files are being listed
+    with ThreadPoolExecutor(max_workers=1) as lookup:
+        commit_future = None if PR_HEAD_SHA else lookup.submit(get_pull_request_commit_id)
+        relevant_files = filter_relevant_files(iter_changed_files())
+        commit_id = PR_HEAD_SHA or commit_future.result()
+
+    if not relevant_files:
+        logger.info("No relevant files to analyze.")
+        sys.exit(0)
 
-    # Process each relevant file to get the diff and send it for review
+    files_by_name = {file['filename']: file for file in relevant_files}
+    ready_feedback = {}
+    diffs = {}
     for file in relevant_files:
-        print(f"Analyzing {file['filename']}...")
+        logger.info("Analyzing %s...", file['filename'])
         added_lines = fetch_added_lines_only(file)
-        if added_lines:
-            print(f"Sending added lines from {file['filename']} to DEX API for review...")
-            feedback = send_diff_to_openai(added_lines, rules)
-            if feedback:
-                post_review(feedback, commit_id, file)
-            else:
-                print(f"No feedback received for {file['filename']}.")
+        if not added_lines:
+            logger.info("No added lines found for %s.", file['filename'])
+            continue
+
+        if is_trivial(file['patch'], file['filename']):
+            logger.info("Skipping DEX API review of trivial changes in %s.", file['filename'])
+            ready_feedback[file['filename']] = TRIVIAL_FEEDBACK
+            continue
+
+        cached_feedback = load_cached_feedback(added_lines)
+        if cached_feedback:
+            logger.info("Using cached feedback for %s.", file['filename'])
+            ready_feedback[file['filename']] = cached_feedback
         else:
-            print(f"No added lines found for {file['filename']}.")
+            diffs[file['filename']] = added_lines
+
+    comments = [build_review_comment(feedback, files_by_name[filename]) for filename, feedback in ready_feedback.items()]
+
+    # Send files to DEX in as few calls as the size budget allows and run the batches concurrently
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        pending = {executor.submit(review_batch, batch): batch for batch in batch_diffs(diffs)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = pending.pop(future)
+                try:
+                    feedback_by_file, missing = future.result()
+                except Exception as e:
+                    logger.error("Review of %s failed: %s", ', '.join(batch), e)
+                    continue
+
+                # Files the model skipped go back to the pool as single-file batches, so the
+                # fallback runs alongside the other batches instead of one by one on this worker
+                if missing:
+                    logger.info("Falling back to per-file review for %s.", ', '.join(missing))
+                    for filename in missing:
+                        single = {filename: batch[filename]}
+                        pending[executor.submit(review_batch, single)] = single
+
+                for filename in batch:
+                    feedback = feedback_by_file.get(filename)
+                    if feedback:
+                        comments.append(build_review_comment(feedback, files_by_name[filename]))
+                    elif filename not in missing:
+                        logger.info("No feedback received for %s.", filename)
+
+    # One review with every file's comment instead of one review per file
+    if comments:
+        post_review(comments, commit_id)
+    else:
+        logger.info("No review comments to post.")
 
 if __name__ == '__main__':
     if not all([GITHUB_TOKEN, GITHUB_REPOSITORY, PR_NUMBER]):
-        print("Missing environment variables.")
+        logger.error("Missing environment variables.")
         sys.exit(1)
-    main()
-
-
-# import os
-# import sys
-# import json
-# import requests
-
-# # GitHub environment variables
-# GITHUB_TOKEN = os.getenv('GITHUB_TOKEN')
-# GITHUB_REPOSITORY = os.getenv('GITHUB_REPOSITORY')
-# PR_NUMBER = os.getenv('PR_NUMBER')
-# GITHUB_API_URL = 'https://api.github.com'
-# custom_service_cookie = os.getenv('CUSTOM_SERVICE_COOKIE')
-
-# # Philips DEX API URL
-# DEX_CHAT_API_URL = 'https://www.dex.inside.philips.com/philips-ai-chat/chat/api/user/SendImageMessage'
-
-# # Headers for GitHub API requests
-# headers = {
-#     'Authorization': f'token {GITHUB_TOKEN}',
-#     'Accept': 'application/vnd.github.v3+json'
-# }
-
-# # Custom headers for DEX API
-# dex_headers = {
-#     'Cookie': f'{custom_service_cookie}',
-#     'Content-Type': 'application/json'
-# }
-
-# def create_dex_chat_session(pr_number):
-#     """Create a DEX chat session for the PR discussion."""
-#     payload = {
-#         "messages": [
-#             {
-#                 "role": "system",
-#                 "content": f"Chat session created for discussion on PR #{pr_number}. Feel free to ask questions or discuss the changes."
-#             }
-#         ]
-#     }
-#     try:
-#         response = requests.post(DEX_CHAT_API_URL, json=payload, headers=dex_headers)
-#         response.raise_for_status()
-#         chat_data = response.json()
-#         if "session_id" in chat_data:
-#             return chat_data["session_id"]
-#         else:
-#             print("Failed to create chat session. Response:", chat_data)
-#             return None
-#     except requests.exceptions.RequestException as e:
-#         print(f"Failed to create chat session: {e}")
-#         return None
-
-# def post_pr_comment_with_chat_link(pr_number, chat_session_url):
-#     """Post a comment on the PR with the chat session link."""
-#     url = f'{GITHUB_API_URL}/repos/{GITHUB_REPOSITORY}/issues/{pr_number}/comments'
-#     headers = {
-#         'Authorization': f'token {GITHUB_TOKEN}',
-#         'Accept': 'application/vnd.github.v3+json'
-#     }
-#     message = f"A live chat session has been created for this PR. Join the discussion here: {chat_session_url}"
-#     payload = {
-#         "body": message
-#     }
-#     response = requests.post(url, headers=headers, json=payload)
-#     response.raise_for_status()
-
-# def get_chat_session_url(session_id):
-#     """Construct the DEX chat session URL using the session ID."""
-#     return f"https://www.dex.inside.philips.com/philips-ai-chat/session/{session_id}"
-
-# def main():
-#     if not all([GITHUB_TOKEN, GITHUB_REPOSITORY, PR_NUMBER, custom_service_cookie]):
-#         print("Missing environment variables.")
-#         sys.exit(1)
-    
-#     # Create a DEX chat session for the PR discussion
-#     session_id = create_dex_chat_session(PR_NUMBER)
-#     if session_id:
-#         chat_session_url = get_chat_session_url(session_id)
-        
-#         # Post the chat session link as a comment in the PR
-#         post_pr_comment_with_chat_link(PR_NUMBER, chat_session_url)
-#         print(f"DEX chat session created and linked to PR #{PR_NUMBER}")
-#     else:
-#         print(f"Failed to create DEX chat session for PR #{PR_NUMBER}")
-
-# if __name__ == '__main__':
-#     main()
+    # Release pooled connections once the review is done
+    with closing(gh_session), closing(dex_session):
+        main()